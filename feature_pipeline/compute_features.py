@@ -4,32 +4,116 @@ from sklearn.impute import SimpleImputer
 from feature_pipeline.aqi_utils import pm25_to_aqi
 
 
-def aggregate_pollutants(meas_df):
+HOUR_NS = 3_600_000_000_000
+
+
+def _parse_times(meas_df):
     # Handle both "timestamp" (OpenAQ) and "time" (Open-Meteo)
     if 'timestamp' in meas_df.columns:
-        meas_df['time'] = pd.to_datetime(meas_df['timestamp'])
+        return pd.to_datetime(meas_df['timestamp'])
     elif 'time' in meas_df.columns:
-        meas_df['time'] = pd.to_datetime(meas_df['time'])
+        return pd.to_datetime(meas_df['time'])
+    raise KeyError("No timestamp or time column found in data")
+
+
+def _dense_codes(keys):
+    """Map int64 keys to 0..k-1 in sorted order; returns (codes, sorted unique keys)."""
+    if len(keys) == 0:
+        return keys.astype(np.int64), keys
+    lo = keys.min()
+    span = int(keys.max() - lo) + 1
+    if span > 4 * len(keys):
+        # Sparse keys (e.g. stray timestamps years apart): fall back to a sort
+        uniques, codes = np.unique(keys, return_inverse=True)
+        return codes, uniques
+    offsets = keys - lo
+    present = np.bincount(offsets, minlength=span) > 0
+    lookup = np.cumsum(present) - 1
+    return lookup[offsets], np.flatnonzero(present) + lo
+
+
+def aggregate_long_readings(meas_df, group_col=None, with_counts=True):
+    """Hourly mean of long-format readings (one row per parameter/value).
+
+    Timestamps are converted once to int64 hour bins and the means are computed
+    with np.bincount into a preallocated (cells x parameters) array, instead of
+    pivot_table. ``group_col`` (e.g. 'city') keeps groups apart; with_counts adds
+    a '<parameter>_count' column per pollutant. The input frame is not modified.
+    """
+    times = _parse_times(meas_df)
+    tz = times.dt.tz
+    if tz is not None:
+        # Floor on local wall-clock hours, like Series.dt.floor
+        times = times.dt.tz_localize(None)
+    ns = times.to_numpy(dtype='datetime64[ns]').view('int64')
+    values = pd.to_numeric(meas_df['value'], errors='coerce').to_numpy(dtype=float)
+    param_codes, param_names = pd.factorize(meas_df['parameter'], sort=True)
+
+    keep = (param_codes >= 0) & ~np.isnan(values) & (ns != np.iinfo(np.int64).min)
+    if group_col is not None:
+        group_codes, group_names = pd.factorize(meas_df[group_col], sort=True)
+        keep &= group_codes >= 0
+
+    hour_codes, hour_values = _dense_codes(ns[keep] // HOUR_NS)
+    n_hours = len(hour_values)
+    if group_col is not None:
+        cell_key = group_codes[keep].astype(np.int64) * n_hours + hour_codes
     else:
-        raise KeyError("No timestamp or time column found in data")
+        cell_key = hour_codes
+    cell_codes, cell_values = _dense_codes(cell_key)
+    n_cells = len(cell_values)
+    n_params = len(param_names)
 
-    # Round or floor to hourly frequency
-    meas_df['hour'] = meas_df['time'].dt.floor('h')
+    flat = cell_codes * n_params + param_codes[keep]
+    size = n_cells * n_params
+    sums = np.bincount(flat, weights=values[keep], minlength=size).reshape(n_cells, n_params)
+    counts = np.bincount(flat, minlength=size).reshape(n_cells, n_params)
+    means = np.full((n_cells, n_params), np.nan)
+    np.divide(sums, counts, out=means, where=counts > 0)
 
+    # Like pivot_table(dropna=True), drop parameters with no valid readings at all
+    observed = counts.sum(axis=0) > 0
+    if not observed.all():
+        param_names = param_names[observed]
+        means, counts = means[:, observed], counts[:, observed]
+
+    if n_cells:
+        hours = pd.to_datetime(hour_values[cell_values % n_hours] * HOUR_NS)
+    else:
+        hours = pd.DatetimeIndex([], dtype='datetime64[ns]')
+    if tz is not None:
+        hours = hours.tz_localize(tz)
+
+    names = [str(c).replace('.', '_').lower() for c in param_names]
+    data = {'time': hours}
+    if group_col is not None:
+        data[group_col] = group_names.take(cell_values // n_hours) if n_cells else group_names[:0]
+    for i, name in enumerate(names):
+        data[name] = means[:, i]
+    if with_counts:
+        for i, name in enumerate(names):
+            data[f'{name}_count'] = counts[:, i]
+    return pd.DataFrame(data)
+
+
+def aggregate_pollutants(meas_df):
     # Pivot pollutants so each parameter becomes a column
     if 'parameter' in meas_df.columns and 'value' in meas_df.columns:
-        pivot = meas_df.pivot_table(index='hour', columns='parameter', values='value', aggfunc='mean')
-        pivot = pivot.reset_index().rename(columns={'hour': 'time'})
-    else:
-        # If Open-Meteo format already has columns like pm10, pm2_5, etc.
-        pivot = meas_df.copy()
-        pivot = pivot.groupby('time').mean(numeric_only=True).reset_index()
+        return aggregate_long_readings(meas_df, with_counts=False)
+
+    # If Open-Meteo format already has columns like pm10, pm2_5, etc.
+    times = _parse_times(meas_df)
+    pivot = meas_df.assign(time=times).groupby('time').mean(numeric_only=True).reset_index()
 
     # Normalize column names
     pivot.columns = [c.replace('.', '_').lower() for c in pivot.columns]
     return pivot
 
 
+def pm25_columns(df):
+    return [c for c in df.columns if 'pm25' in c or 'pm2_5' in c or 'pm2.5' in c]
+
+
 def build_features(pollutant_df, weather_df=None):
     df = pollutant_df.copy()
     df = df.sort_values('time')
@@ -38,7 +122,7 @@ def build_features(pollutant_df, weather_df=None):
     df['month'] = df['time'].dt.month
 
     # Handle PM2.5 and AQI calculation
-    pm_cols = [c for c in df.columns if 'pm25' in c or 'pm2_5' in c or 'pm2.5' in c]
+    pm_cols = pm25_columns(df)
     if pm_cols:
         df['pm25_val'] = df[pm_cols[0]]
         df['aqi_pm25'] = df['pm25_val'].apply(pm25_to_aqi)
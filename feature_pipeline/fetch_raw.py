@@ -6,13 +6,14 @@ from datetime import datetime, timedelta
 OPENAQ_BASE = os.getenv("OPENAQ_BASE", "https://api.openaq.org/v2")
 OPEN_METEO_BASE = os.getenv("OPEN_METEO_BASE", "https://api.open-meteo.com/v1/forecast")
 
-def fetch_openaq(city: str, days: int = 14):
+def fetch_openaq(city: str, days: int = 14, lat: float = None, lon: float = None):
     """Fetch AQI-like data from Open-Meteo Air Quality API for given city."""
-    # Use coordinates for Karachi
+    # Use coordinates for Karachi unless explicit ones are given
     coords = {
         "Karachi": (24.8607, 67.0011)
     }
-    lat, lon = coords.get(city, (24.8607, 67.0011))
+    if lat is None or lon is None:
+        lat, lon = coords.get(city, (24.8607, 67.0011))
 
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
@@ -25,7 +26,7 @@ def fetch_openaq(city: str, days: int = 14):
         f"&hourly=pm10,pm2_5,carbon_monoxide,ozone,nitrogen_dioxide,sulphur_dioxide,us_aqi"
     )
 
-    resp = requests.get(url)
+    resp = requests.get(url, timeout=30)
     resp.raise_for_status()
     data = resp.json()
 
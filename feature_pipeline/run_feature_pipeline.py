@@ -24,7 +24,8 @@ HOPSWORKS_API_KEY = os.getenv("HOPSWORKS_API_KEY")
 HOPSWORKS_PROJECT = os.getenv("HOPSWORKS_PROJECT", "default")
 
 
-def save_to_hopsworks(features: pd.DataFrame):
+def save_to_hopsworks(features: pd.DataFrame, feature_group_name: str = "karachi_aqi_features",
+                      fallback_path: str = "data/features.csv", city: str = "Karachi"):
     """Save processed features to Hopsworks Feature Store."""
     try:
         print("☁️ Connecting to Hopsworks...")
@@ -32,21 +33,50 @@ def save_to_hopsworks(features: pd.DataFrame):
         fs = project.get_feature_store()
 
         feature_group = fs.get_or_create_feature_group(
-            name="karachi_aqi_features",
+            name=feature_group_name,
             version=1,
             primary_key=["timestamp"],
-            description="Karachi hourly AQI and weather features for forecasting",
+            description=f"{city} hourly AQI and weather features for forecasting",
             online_enabled=False
         )
 
         # Append new data (no overwrite)
         feature_group.insert(features, write_options={"wait_for_job": False})
-        print(f"✅ Successfully uploaded {len(features)} rows to Hopsworks Feature Group 'karachi_aqi_features'.")
+        print(f"✅ Successfully uploaded {len(features)} rows to Hopsworks Feature Group '{feature_group_name}'.")
     except Exception as e:
         print(f"❌ Failed to upload features to Hopsworks: {e}")
         print("💾 Saving locally instead.")
-        os.makedirs("data", exist_ok=True)
-        features.to_csv("data/features.csv", index=False)
+        save_locally(features, fallback_path)
+
+
+def save_locally(features: pd.DataFrame, path: str = "data/features.csv"):
+    """Write features to a local CSV, creating the parent folder if needed."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    features.to_csv(path, index=False)
+
+
+def fetch_city_weather(raw: pd.DataFrame, lat: float, lon: float, days: int = DAYS_HISTORY):
+    """Fetch weather covering the time span of the raw AQI data."""
+    if "time" in raw.columns:
+        start_date = pd.to_datetime(raw["time"].min())
+        end_date = pd.to_datetime(raw["time"].max())
+    else:
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
+    return fetch_weather(lat, lon, start_date, end_date)
+
+
+def ensure_timestamp(features: pd.DataFrame):
+    """Ensure a timestamp column exists (used as the Hopsworks primary key)."""
+    if "time" in features.columns and "timestamp" not in features.columns:
+        features["timestamp"] = pd.to_datetime(features["time"])
+    elif "timestamp" in features.columns:
+        features["timestamp"] = pd.to_datetime(features["timestamp"])
+    else:
+        features["timestamp"] = pd.date_range(end=pd.Timestamp.utcnow(), periods=len(features), freq="h")
+    return features
 
 
 def main():
@@ -73,15 +103,8 @@ def main():
 
     # Step 3: Fetch weather data (Karachi coordinates)
     lat, lon = 24.8607, 67.0011
-    if "time" in raw.columns:
-        start_date = pd.to_datetime(raw["time"].min())
-        end_date = pd.to_datetime(raw["time"].max())
-    else:
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=DAYS_HISTORY)
-
     try:
-        weather = fetch_weather(lat, lon, start_date, end_date)
+        weather = fetch_city_weather(raw, lat, lon, DAYS_HISTORY)
         print("✅ Weather data fetched successfully")
     except Exception as e:
         print(f"⚠️ Could not fetch weather data: {e}")
@@ -96,17 +119,11 @@ def main():
         return
 
     # Step 5: Ensure timestamp column for Hopsworks
-    if "time" in features.columns and "timestamp" not in features.columns:
-        features["timestamp"] = pd.to_datetime(features["time"])
-    elif "timestamp" in features.columns:
-        features["timestamp"] = pd.to_datetime(features["timestamp"])
-    else:
-        features["timestamp"] = pd.date_range(end=pd.Timestamp.utcnow(), periods=len(features), freq="h")
+    features = ensure_timestamp(features)
 
     # Step 6: Save to local or Hopsworks
     if LOCAL:
-        os.makedirs("data", exist_ok=True)
-        features.to_csv("data/features.csv", index=False)
+        save_locally(features, "data/features.csv")
         print("💾 Saved features to data/features.csv (Local Mode)")
     else:
         save_to_hopsworks(features)
@@ -0,0 +1,189 @@
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+FORECAST_DB_PATH = os.getenv("FORECAST_DB_PATH", "data/forecasts.db")
+HOURS_PER_DAY = 24
+
+# Times are stored as UTC epoch seconds; naive timestamps are treated as UTC.
+# A forecast with horizon N (days) targets the mean AQI of the 24 hours ending
+# at target_time = issue_time + N days, matching target_dayN in build_features.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    city          TEXT    NOT NULL,
+    issue_time    INTEGER NOT NULL,
+    horizon       INTEGER NOT NULL,
+    model_version TEXT    NOT NULL,
+    target_time   INTEGER NOT NULL,
+    aqi_pred      REAL    NOT NULL,
+    created_at    INTEGER NOT NULL DEFAULT (strftime('%s', 'now')),
+    PRIMARY KEY (city, issue_time, horizon, model_version)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_forecasts_city_target ON forecasts (city, target_time);
+
+CREATE TABLE IF NOT EXISTS observations (
+    city     TEXT    NOT NULL,
+    time     INTEGER NOT NULL,
+    aqi_pm25 REAL    NOT NULL,
+    PRIMARY KEY (city, time)
+) WITHOUT ROWID;
+"""
+
+
+def _epoch_seconds(values):
+    """Vectorized conversion of timestamps to UTC epoch seconds (int64)."""
+    times = pd.to_datetime(pd.Series(values))
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    return times.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def _from_epoch(seconds):
+    return pd.to_datetime(seconds, unit="s")
+
+
+class ForecastStore:
+    """SQLite store of issued forecasts and observed AQI for live accuracy tracking.
+
+    Forecasts are keyed by (city, issue_time, horizon, model_version); the primary
+    key serves "latest forecast per city" lookups and an index on
+    (city, target_time) serves forecast-vs-observed range joins.
+    """
+
+    def __init__(self, path=FORECAST_DB_PATH):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Generous timeout: batch workers may write to the same file concurrently
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_forecasts(self, city, issue_time, predictions, model_version):
+        """Store one issued forecast; ``predictions`` maps horizon (days) -> AQI."""
+        issue = int(_epoch_seconds([issue_time])[0])
+        # Sub-second created_at so versions written in the same second still order correctly
+        created = time.time()
+        rows = [
+            (city, issue, int(h), str(model_version), issue + int(h) * HOURS_PER_DAY * 3600, float(aqi), created)
+            for h, aqi in predictions.items()
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO forecasts "
+                "(city, issue_time, horizon, model_version, target_time, aqi_pred, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def record_observations(self, city, df, time_col="time", value_col="aqi_pm25"):
+        """Upsert observed hourly AQI from a features frame."""
+        sub = df[[time_col, value_col]].dropna()
+        times = _epoch_seconds(sub[time_col])
+        values = sub[value_col].to_numpy(dtype=float)
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO observations (city, time, aqi_pm25) VALUES (?, ?, ?)",
+                zip([city] * len(times), times.tolist(), values.tolist()),
+            )
+        return len(times)
+
+    def latest_forecast(self, city, model_version=None):
+        """Most recently issued forecast for a city, one row per horizon.
+
+        When several model versions share the latest issue time (e.g. the feature
+        and training tasks of one --stage all run), the most recently written
+        version wins.
+        """
+        version_clause = "AND model_version = ?" if model_version is not None else ""
+        params = [city] + ([model_version] if model_version is not None else [])
+        query = f"""
+            SELECT city, issue_time, horizon, model_version, target_time, aqi_pred, created_at
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY horizon ORDER BY created_at DESC, model_version DESC
+                ) AS rn
+                FROM forecasts
+                WHERE city = ? {version_clause}
+                  AND issue_time = (SELECT MAX(issue_time) FROM forecasts WHERE city = ? {version_clause})
+            )
+            WHERE rn = 1
+            ORDER BY horizon
+        """
+        with self._connect() as conn:
+            df = pd.read_sql_query(query, conn, params=params + params)
+        return self._decode_times(df)
+
+    def forecast_vs_observed(self, city=None, start=None, end=None, min_hours=HOURS_PER_DAY):
+        """Join forecasts with the mean observed AQI of their 24h target window.
+
+        Only forecasts whose window has at least ``min_hours`` observations are
+        returned. ``start``/``end`` filter on target_time.
+        """
+        clauses, params = [], []
+        if city is not None:
+            clauses.append("f.city = ?")
+            params.append(city)
+        if start is not None:
+            clauses.append("f.target_time >= ?")
+            params.append(int(_epoch_seconds([start])[0]))
+        if end is not None:
+            clauses.append("f.target_time <= ?")
+            params.append(int(_epoch_seconds([end])[0]))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"""
+            SELECT f.city, f.issue_time, f.horizon, f.model_version, f.target_time, f.aqi_pred,
+                   AVG(o.aqi_pm25) AS aqi_observed, COUNT(o.aqi_pm25) AS n_hours
+            FROM forecasts f
+            JOIN observations o
+              ON o.city = f.city
+             AND o.time > f.target_time - {HOURS_PER_DAY * 3600}
+             AND o.time <= f.target_time
+            {where}
+            GROUP BY f.city, f.issue_time, f.horizon, f.model_version
+            HAVING COUNT(o.aqi_pm25) >= ?
+            ORDER BY f.city, f.target_time, f.horizon
+        """
+        with self._connect() as conn:
+            df = pd.read_sql_query(query, conn, params=params + [min_hours])
+        return self._decode_times(df)
+
+    def backtest_report(self, city=None, start=None, end=None, min_hours=HOURS_PER_DAY):
+        """Accuracy of stored forecasts per (city, horizon, model_version): n, MAE, RMSE, bias."""
+        joined = self.forecast_vs_observed(city=city, start=start, end=end, min_hours=min_hours)
+        keys = ["city", "horizon", "model_version"]
+        if joined.empty:
+            return pd.DataFrame(columns=keys + ["n", "mae", "rmse", "bias"])
+
+        err = joined["aqi_pred"] - joined["aqi_observed"]
+        joined = joined.assign(abs_err=err.abs(), sq_err=err ** 2, err=err)
+        report = joined.groupby(keys).agg(
+            n=("err", "size"),
+            mae=("abs_err", "mean"),
+            rmse=("sq_err", "mean"),
+            bias=("err", "mean"),
+        ).reset_index()
+        report["rmse"] = np.sqrt(report["rmse"])
+        return report
+
+    @staticmethod
+    def _decode_times(df):
+        for col in ("issue_time", "target_time", "created_at"):
+            if col in df.columns:
+                df[col] = _from_epoch(df[col])
+        return df
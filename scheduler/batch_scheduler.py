@@ -0,0 +1,184 @@
+import time
+import traceback
+import multiprocessing
+from multiprocessing.connection import wait
+
+# Seconds a worker gets to exit on its own (or after SIGTERM) before escalating
+EXIT_GRACE = 1.0
+
+
+class Task:
+    """A unit of work run in its own worker process.
+
+    ``fn`` must be a module-level function so it can be sent to a worker process.
+    ``deps`` are names of tasks that must succeed before this one starts.
+    """
+
+    def __init__(self, name, fn, args=(), kwargs=None, deps=(), timeout=None, retries=0):
+        self.name = name
+        self.fn = fn
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs or {})
+        self.deps = list(deps)
+        self.timeout = timeout
+        self.retries = retries
+
+
+def _check_graph(tasks):
+    """Raise ValueError on duplicate names, unknown dependencies or cycles."""
+    by_name = {}
+    for task in tasks:
+        if task.name in by_name:
+            raise ValueError(f"Duplicate task name: {task.name}")
+        by_name[task.name] = task
+
+    for task in tasks:
+        for dep in task.deps:
+            if dep not in by_name:
+                raise ValueError(f"Task '{task.name}' depends on unknown task '{dep}'")
+
+    # Kahn's algorithm: anything left over is part of a cycle
+    remaining = {t.name: len(t.deps) for t in tasks}
+    dependents = {t.name: [] for t in tasks}
+    for task in tasks:
+        for dep in task.deps:
+            dependents[dep].append(task.name)
+    ready = [name for name, n in remaining.items() if n == 0]
+    while ready:
+        name = ready.pop()
+        for child in dependents[name]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+        del remaining[name]
+    if remaining:
+        raise ValueError(f"Dependency cycle between tasks: {sorted(remaining)}")
+    return by_name
+
+
+def _run_attempt(conn, fn, args, kwargs):
+    """Worker process entry point: run one attempt and send back its outcome."""
+    try:
+        outcome = ("ok", fn(*args, **kwargs))
+    except BaseException as e:
+        outcome = ("error", "".join(traceback.format_exception_only(type(e), e)).strip())
+    try:
+        conn.send(outcome)
+    except Exception as e:
+        conn.send(("error", f"could not send result: {e}"))
+    finally:
+        conn.close()
+
+
+def _stop(proc, grace=EXIT_GRACE):
+    """Terminate a worker process, escalating to kill if it ignores SIGTERM."""
+    proc.terminate()
+    proc.join(grace)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+
+
+def run_tasks(tasks, max_workers=4, retry_delay=5.0, poll_interval=0.5, log=print):
+    """Run tasks in up to ``max_workers`` processes respecting dependencies, timeouts and retries.
+
+    Returns a dict of task name -> record with ``status`` (success, failed, timeout
+    or skipped), ``attempts``, ``duration``, ``error`` and the task's ``result``.
+
+    Each attempt runs in its own process, so a timed-out attempt is terminated
+    before its retry is scheduled and never runs alongside it.
+    """
+    by_name = _check_graph(tasks)
+    records = {
+        t.name: {"status": "pending", "attempts": 0, "duration": 0.0, "error": None, "result": None}
+        for t in tasks
+    }
+    not_before = {}
+    running = {}  # result connection -> (task, process, started)
+
+    def finish(task, status, error=None, result=None):
+        rec = records[task.name]
+        if status in ("failed", "timeout") and rec["attempts"] <= task.retries:
+            log(f"🔁 {task.name}: attempt {rec['attempts']} {status} ({error}), retrying")
+            rec["status"] = "pending"
+            not_before[task.name] = time.monotonic() + retry_delay
+            return
+        rec.update(status=status, error=error, result=result)
+        icon = "✅" if status == "success" else "❌"
+        log(f"{icon} {task.name}: {status} after {rec['attempts']} attempt(s)")
+
+    ctx = multiprocessing.get_context()
+    try:
+        while True:
+            # Propagate failures downstream before scheduling anything new
+            for task in tasks:
+                rec = records[task.name]
+                if rec["status"] != "pending":
+                    continue
+                bad = [d for d in task.deps if records[d]["status"] in ("failed", "timeout", "skipped")]
+                if bad:
+                    rec.update(status="skipped", error=f"dependency not satisfied: {', '.join(bad)}")
+                    log(f"⏭️ {task.name}: skipped ({rec['error']})")
+
+            free = max_workers - len(running)
+            now = time.monotonic()
+            for task in tasks:
+                if free <= 0:
+                    break
+                rec = records[task.name]
+                if rec["status"] != "pending" or not_before.get(task.name, 0) > now:
+                    continue
+                if any(records[d]["status"] != "success" for d in task.deps):
+                    continue
+                rec["status"] = "running"
+                rec["attempts"] += 1
+                reader, writer = ctx.Pipe(duplex=False)
+                proc = ctx.Process(target=_run_attempt, args=(writer, task.fn, task.args, task.kwargs),
+                                   name=task.name, daemon=True)
+                proc.start()
+                writer.close()
+                running[reader] = (task, proc, time.monotonic())
+                free -= 1
+
+            if not running and all(r["status"] != "pending" for r in records.values()):
+                break
+
+            if not running:
+                # Only retries waiting out their delay remain
+                time.sleep(poll_interval)
+                continue
+            # A connection becomes ready when the worker sends its outcome or exits
+            ready = wait(list(running), timeout=poll_interval)
+            now = time.monotonic()
+            for reader in ready:
+                task, proc, started = running.pop(reader)
+                records[task.name]["duration"] += now - started
+                try:
+                    kind, payload = reader.recv()
+                except EOFError:
+                    kind, payload = "error", None
+                reader.close()
+                # The outcome is in; don't let lingering non-daemon threads hold the loop
+                proc.join(EXIT_GRACE)
+                if proc.is_alive():
+                    _stop(proc)
+                if kind == "ok":
+                    finish(task, "success", result=payload)
+                else:
+                    finish(task, "failed", error=payload or f"worker exited with code {proc.exitcode}")
+
+            for reader, (task, proc, started) in list(running.items()):
+                if task.timeout is not None and now - started > task.timeout:
+                    running.pop(reader)
+                    _stop(proc)
+                    reader.close()
+                    records[task.name]["duration"] += now - started
+                    finish(task, "timeout", error=f"exceeded {task.timeout}s")
+    finally:
+        for reader, (task, proc, started) in running.items():
+            _stop(proc)
+            reader.close()
+
+    for name in by_name:
+        records[name]["name"] = name
+    return records
@@ -0,0 +1,187 @@
+import os
+import sys
+import hashlib
+import joblib
+import pandas as pd
+
+# Ensure parent folder is on sys.path (workers import this module directly)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feature_pipeline.fetch_raw import fetch_openaq
+from feature_pipeline.aqi_utils import pm25_to_aqi
+from feature_pipeline.compute_features import aggregate_pollutants, build_features, pm25_columns
+from feature_pipeline.run_feature_pipeline import (
+    fetch_city_weather, ensure_timestamp, save_locally, save_to_hopsworks
+)
+from training_pipeline.train_models import (
+    load_features, feature_columns, train_all_days, upload_models_to_hopsworks
+)
+from forecast_store.forecast_store import FORECAST_DB_PATH, ForecastStore
+
+CITIES_DATA_DIR = "data/cities"
+
+
+def current_hour():
+    """Current UTC hour as a naive timestamp (Open-Meteo times are naive GMT)."""
+    return pd.Timestamp.now(tz="UTC").tz_localize(None).floor("h")
+
+
+def city_slug(city: str):
+    return city.strip().lower().replace(" ", "_")
+
+
+def city_paths(city: str, data_dir: str = CITIES_DATA_DIR):
+    """Per-city locations of the features CSV and model folder."""
+    base = os.path.join(data_dir, city_slug(city))
+    return {
+        "features": os.path.join(base, "features.csv"),
+        "models": os.path.join(base, "models"),
+    }
+
+
+def frame_fingerprint(*frames):
+    """Content hash of one or more DataFrames (column names included)."""
+    h = hashlib.sha256()
+    for df in frames:
+        if df is None or df.empty:
+            h.update(b"<empty>")
+            continue
+        h.update(",".join(map(str, df.columns)).encode())
+        h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def file_fingerprint(path: str):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def run_city_features(city, lat, lon, days, local=True, data_dir=CITIES_DATA_DIR, last_fingerprint=None,
+                      model_version=None):
+    """Fetch -> build -> store for one city.
+
+    The raw AQI + weather inputs are fingerprinted; if they match ``last_fingerprint``
+    and the features file already exists, building and storing are skipped.
+    When ``model_version`` is given and the city has trained models, a forecast is
+    issued from the fresh features.
+    """
+    paths = city_paths(city, data_dir)
+
+    raw = fetch_openaq(city, days=days, lat=lat, lon=lon)
+    if raw is None or raw.empty:
+        raise RuntimeError(f"No AQI data fetched for {city}")
+
+    try:
+        weather = fetch_city_weather(raw, lat, lon, days)
+    except Exception as e:
+        print(f"⚠️ Could not fetch weather data for {city}: {e}")
+        weather = pd.DataFrame()
+
+    fingerprint = frame_fingerprint(raw, weather)
+    if fingerprint == last_fingerprint and os.path.exists(paths["features"]):
+        return {"status": "unchanged", "fingerprint": fingerprint}
+
+    poll = aggregate_pollutants(raw)
+    features = ensure_timestamp(build_features(poll, weather))
+
+    # Training reads the local copy, so it is always written
+    save_locally(features, paths["features"])
+    if not local:
+        save_to_hopsworks(features, feature_group_name=f"{city_slug(city)}_aqi_features",
+                          fallback_path=paths["features"], city=city)
+
+    result = {"status": "updated", "fingerprint": fingerprint, "rows": len(features)}
+    result.update(_record_observations_logged(city, poll))
+    if model_version and os.path.isdir(paths["models"]):
+        # Reload so columns/dtypes match what the models were trained on
+        result.update(_issue_forecasts_logged(city, load_features(paths["features"]), paths["models"], model_version))
+    return result
+
+
+def observed_aqi(pollutant_df, now=None):
+    """Observed hourly AQI up to ``now`` from aggregated (pre-imputation) pm2.5 readings.
+
+    The API also returns forecast hours for the rest of the day, and build_features
+    imputes gaps, so neither the future rows nor the features frame are used.
+    """
+    now = current_hour() if now is None else now
+    pm_cols = pm25_columns(pollutant_df)
+    if not pm_cols:
+        return pd.DataFrame(columns=["time", "aqi_pm25"])
+    obs = pd.DataFrame({
+        "time": pd.to_datetime(pollutant_df["time"]),
+        "aqi_pm25": pd.to_numeric(pollutant_df[pm_cols[0]].map(pm25_to_aqi), errors="coerce"),
+    })
+    return obs[obs["time"] <= now].dropna()
+
+
+def issue_forecasts(city, df, models_dir, model_version, now=None, db_path=FORECAST_DB_PATH):
+    """Predict every horizon from the last feature row at or before ``now`` and store it.
+
+    The issue time is that row's hour, so the stored forecast reflects what was
+    known when it was made rather than the API's trailing forecast hours.
+    """
+    now = current_hour() if now is None else now
+    current = df[df["time"] <= now].tail(1)
+    if current.empty:
+        raise RuntimeError(f"No feature row at or before {now}")
+    X = current[feature_columns(df)]
+    predictions = {}
+    for day in [1, 2, 3]:
+        model_path = os.path.join(models_dir, f"model_day{day}.pkl")
+        if os.path.exists(model_path):
+            predictions[day] = float(joblib.load(model_path).predict(X)[0])
+
+    if predictions:
+        ForecastStore(db_path).record_forecasts(city, current["time"].iloc[0], predictions, model_version)
+    return predictions
+
+
+def _record_observations_logged(city, pollutant_df, db_path=FORECAST_DB_PATH):
+    """Record observed AQI without failing the task: features are already written."""
+    try:
+        n = ForecastStore(db_path).record_observations(city, observed_aqi(pollutant_df))
+    except Exception as e:
+        print(f"⚠️ Could not record observations for {city}: {e}")
+        return {"observations_error": f"{type(e).__name__}: {e}"}
+    return {"observations": n}
+
+
+def _issue_forecasts_logged(city, df, models_dir, model_version):
+    """Issue forecasts without failing the task: features/models are already written."""
+    try:
+        predictions = issue_forecasts(city, df, models_dir, model_version)
+    except Exception as e:
+        print(f"⚠️ Could not issue forecast for {city}: {e}")
+        return {"forecast_error": f"{type(e).__name__}: {e}"}
+    if not predictions:
+        return {"forecast_error": f"no model_dayN.pkl found in {models_dir}"}
+    return {"forecast": predictions}
+
+
+def run_city_training(city, local=True, data_dir=CITIES_DATA_DIR, last_fingerprint=None):
+    """Train -> register -> forecast for one city; skipped when its features file is unchanged."""
+    paths = city_paths(city, data_dir)
+    fingerprint = file_fingerprint(paths["features"])
+    if fingerprint == last_fingerprint and os.path.isdir(paths["models"]):
+        return {"status": "unchanged", "fingerprint": fingerprint}
+
+    df = load_features(paths["features"])
+    metrics_dict = train_all_days(df, models_dir=paths["models"])
+    if not metrics_dict:
+        raise RuntimeError(f"No models trained for {city}")
+
+    if not local:
+        upload_models_to_hopsworks(metrics_dict, models_dir=paths["models"], name_prefix=f"{city_slug(city)}_")
+
+    # Models are versioned by the features they were trained on
+    forecast = _issue_forecasts_logged(city, df, paths["models"], model_version=fingerprint[:12])
+
+    metrics = {
+        name: {k: float(v) for k, v in details["metrics"].items()}
+        for name, details in metrics_dict.items()
+    }
+    return {"status": "trained", "fingerprint": fingerprint, "metrics": metrics, **forecast}
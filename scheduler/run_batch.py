@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Ensure parent folder is on sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler.batch_scheduler import Task, run_tasks
+from scheduler.city_tasks import CITIES_DATA_DIR, run_city_features, run_city_training
+
+# Load environment variables
+load_dotenv()
+
+CITIES_FILE = os.getenv("CITIES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cities.json"))
+DAYS_HISTORY = int(os.getenv("DAYS_HISTORY", "14"))
+LOCAL = os.getenv("LOCAL_FEATURE_STORE", "1") == "1"
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+RUNS_DIR = "data/runs"
+STATE_PATH = os.path.join(RUNS_DIR, "state.json")
+
+
+def load_catalogue(path=CITIES_FILE):
+    """Load the city catalogue: a JSON list of {"name", "lat", "lon"}."""
+    with open(path, encoding="utf-8") as f:
+        cities = json.load(f)
+    for city in cities:
+        missing = {"name", "lat", "lon"} - set(city)
+        if missing:
+            raise ValueError(f"City entry {city} is missing {sorted(missing)}")
+    return cities
+
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_tasks(cities, stage, state, timeout, retries, force=False):
+    """Create features:<city> and train:<city> tasks; training depends on features."""
+    tasks = []
+    for city in cities:
+        name = city["name"]
+        city_state = {} if force else state.get(name, {})
+        if stage in ("features", "all"):
+            tasks.append(Task(
+                f"features:{name}", run_city_features,
+                args=(name, city["lat"], city["lon"], DAYS_HISTORY),
+                kwargs={"local": LOCAL, "data_dir": CITIES_DATA_DIR,
+                        "last_fingerprint": city_state.get("inputs"),
+                        "model_version": state.get(name, {}).get("trained_on", "")[:12] or None},
+                timeout=timeout, retries=retries,
+            ))
+        if stage in ("train", "all"):
+            tasks.append(Task(
+                f"train:{name}", run_city_training,
+                args=(name,),
+                kwargs={"local": LOCAL, "data_dir": CITIES_DATA_DIR,
+                        "last_fingerprint": city_state.get("trained_on")},
+                deps=[f"features:{name}"] if stage == "all" else [],
+                timeout=timeout, retries=retries,
+            ))
+    return tasks
+
+
+def update_state(state, records):
+    """Remember input fingerprints of successful tasks for the next run."""
+    keys = {"features": "inputs", "train": "trained_on"}
+    for name, rec in records.items():
+        result = rec["result"]
+        if rec["status"] != "success" or not isinstance(result, dict) or "fingerprint" not in result:
+            continue
+        kind, city = name.split(":", 1)
+        state.setdefault(city, {})[keys[kind]] = result["fingerprint"]
+    return state
+
+
+def write_report(records, started, finished, stage):
+    """Write a JSON run report to data/runs/ and return its path."""
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    counts = {}
+    for rec in records.values():
+        counts[rec["status"]] = counts.get(rec["status"], 0) + 1
+    report = {
+        "stage": stage,
+        "started": started.isoformat(timespec="seconds"),
+        "finished": finished.isoformat(timespec="seconds"),
+        "duration": round((finished - started).total_seconds(), 2),
+        "counts": counts,
+        "tasks": list(records.values()),
+    }
+    path = os.path.join(RUNS_DIR, f"run_{started.strftime('%Y%m%dT%H%M%S')}_{stage}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run feature and training pipelines for many cities.")
+    parser.add_argument("--stage", choices=["features", "train", "all"], default="all")
+    parser.add_argument("--cities", default=CITIES_FILE, help="Path to the city catalogue JSON")
+    parser.add_argument("--only", nargs="*", help="Restrict the run to these city names")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-task timeout in seconds")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--force", action="store_true", help="Ignore fingerprints and rerun everything")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cities = load_catalogue(args.cities)
+    if args.only:
+        cities = [c for c in cities if c["name"] in args.only]
+    print(f"🌍 Starting batch '{args.stage}' run for {len(cities)} cities with {args.workers} workers")
+
+    state = load_state()
+    tasks = build_tasks(cities, args.stage, state, args.timeout, args.retries, force=args.force)
+
+    started = datetime.utcnow()
+    records = run_tasks(tasks, max_workers=args.workers)
+    finished = datetime.utcnow()
+
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    with open(STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(update_state(state, records), f, indent=2)
+    report_path = write_report(records, started, finished, args.stage)
+    print(f"📝 Run report written to {report_path}")
+
+    failed = [name for name, rec in records.items() if rec["status"] != "success"]
+    if failed:
+        print(f"⚠️ {len(failed)} task(s) did not succeed: {', '.join(failed)}")
+        return 1
+    print("🏁 Batch run completed successfully!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+# Run the multi-city batch scheduler using venv python
+# Usage: run_batch_pipeline.ps1 [-Stage features|train|all]
+param([string]$Stage = "features")
+$proj = Split-Path -Parent $MyInvocation.MyCommand.Definition
+$python = Join-Path $proj ".venv\Scripts\python.exe"
+& $python (Join-Path $proj "scheduler\run_batch.py") --stage $Stage
@@ -48,8 +48,11 @@ def train_and_evaluate(X_train, X_test, y_train, y_test, day_label):
     return model, {"rmse": rmse, "mae": mae, "r2": r2}
 
 
-def upload_models_to_hopsworks(metrics_dict):
-    """Upload all trained models to Hopsworks Model Registry with metrics and tags."""
+def upload_models_to_hopsworks(metrics_dict, models_dir=MODELS_DIR, name_prefix=""):
+    """Upload all trained models to Hopsworks Model Registry with metrics and tags.
+
+    ``name_prefix`` is prepended to registry names so several cities can share one registry.
+    """
     try:
         print("☁️ Connecting to Hopsworks Model Registry...")
         project = login(
@@ -60,7 +63,7 @@ def upload_models_to_hopsworks(metrics_dict):
 
         uploaded = 0
         for model_name, details in metrics_dict.items():
-            model_path = os.path.join(MODELS_DIR, f"{model_name}.pkl")
+            model_path = os.path.join(models_dir, f"{model_name}.pkl")
             if not os.path.exists(model_path):
                 print(f"⚠️ Model file {model_path} not found, skipping.")
                 continue
@@ -69,9 +72,10 @@ def upload_models_to_hopsworks(metrics_dict):
             metrics = {k: float(v) for k, v in metrics.items()}  # Ensure JSON-safe
 
             # ✅ Upload model
+            registry_name = f"{name_prefix}{model_name}"
             model_obj = mr.python.create_model(
-                name=model_name,
-                description=f"Random Forest AQI forecast model for {model_name}",
+                name=registry_name,
+                description=f"Random Forest AQI forecast model for {registry_name}",
                 metrics=metrics
             )
             model_obj.save(model_path)
@@ -81,9 +85,9 @@ def upload_models_to_hopsworks(metrics_dict):
                 for key, value in metrics.items():
                     model_obj.add_tag(key, value)
             except Exception as e:
-                print(f"⚠️ Could not add tags to {model_name}: {e}")
+                print(f"⚠️ Could not add tags to {registry_name}: {e}")
 
-            print(f"✅ Uploaded {model_name}.pkl to Hopsworks Model Registry")
+            print(f"✅ Uploaded {model_name}.pkl to Hopsworks Model Registry as '{registry_name}'")
             uploaded += 1
 
         if uploaded > 0:
@@ -95,16 +99,18 @@ def upload_models_to_hopsworks(metrics_dict):
         print(f"❌ Failed to upload models to Hopsworks: {e}")
 
 
-def main():
-    print("🚀 Starting model training pipeline...")
+def feature_columns(df):
+    """Numeric model inputs (everything except time and targets)."""
+    ignore_cols = ["time", "timestamp", "target_day1", "target_day2", "target_day3"]
+    numeric_cols = df.select_dtypes(include="number").columns
+    return [c for c in numeric_cols if c not in ignore_cols]
 
-    df = load_features()
-    print(f"✅ Loaded {len(df)} rows from {DATA_PATH}")
 
-    ignore_cols = ["time", "target_day1", "target_day2", "target_day3"]
-    feature_cols = [c for c in df.columns if c not in ignore_cols and df[c].dtype != "object"]
+def train_all_days(df, models_dir=MODELS_DIR):
+    """Train and save one model per forecast day; returns the metrics dict."""
+    feature_cols = feature_columns(df)
 
-    os.makedirs(MODELS_DIR, exist_ok=True)
+    os.makedirs(models_dir, exist_ok=True)
     metrics_dict = {}
 
     for day in [1, 2, 3]:
@@ -127,13 +133,24 @@ def main():
 
         model, metrics = train_and_evaluate(X_train, X_test, y_train, y_test, f"Day {day}")
         model_name = f"model_day{day}"
-        model_path = os.path.join(MODELS_DIR, f"{model_name}.pkl")
+        model_path = os.path.join(models_dir, f"{model_name}.pkl")
 
         joblib.dump(model, model_path)
         print(f"💾 Saved model to {model_path}")
 
         metrics_dict[model_name] = {"metrics": metrics}
 
+    return metrics_dict
+
+
+def main():
+    print("🚀 Starting model training pipeline...")
+
+    df = load_features()
+    print(f"✅ Loaded {len(df)} rows from {DATA_PATH}")
+
+    metrics_dict = train_all_days(df)
+
     print("🏁 Training completed successfully!")
     upload_models_to_hopsworks(metrics_dict)
 
@@ -10,11 +10,19 @@ from hopsworks import login
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+import sys
+
+# Ensure parent folder is on sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecast_store.forecast_store import ForecastStore
 
 # Load environment variables
 load_dotenv()
 HOPSWORKS_HOST = os.getenv("HOPSWORKS_HOST")
 HOPSWORKS_API_KEY = os.getenv("HOPSWORKS_API_KEY")
+# Stored forecasts older than this are treated as stale and replaced by a live prediction
+FORECAST_MAX_AGE_HOURS = float(os.getenv("FORECAST_MAX_AGE_HOURS", "3"))
 
 st.set_page_config(page_title="Pearls AQI Predictor", layout="wide")
 
@@ -22,6 +30,10 @@ st.set_page_config(page_title="Pearls AQI Predictor", layout="wide")
 st.sidebar.title("🌍 Pearls AQI Predictor (Hopsworks Integrated)")
 page = st.sidebar.radio("Navigation", ["Forecast Dashboard", "EDA Dashboard"])
 
+@st.cache_resource
+def get_forecast_store():
+    return ForecastStore()
+
 # Common data loader
 @st.cache_data
 def load_data():
@@ -65,14 +77,16 @@ if page == "Forecast Dashboard":
         model_dir = latest_model.download()
         model_path = os.path.join(model_dir, f"{model_name}.pkl")
 
+        model_version = f"v{latest_model.version}"
         if not os.path.exists(model_path):
             st.warning(f"Model file not found in {model_dir}, using local fallback.")
             model_path = os.path.join("data", "models", f"{model_name}.pkl")
+            model_version = "local"
 
         model = joblib.load(model_path)
-        return model
+        return model, model_version
 
-    model = load_latest_model(day_choice)
+    model, model_version = load_latest_model(day_choice)
 
     ignore_cols = ["time", "timestamp", "target_day1", "target_day2", "target_day3"]
     X = df[[c for c in df.columns if c not in ignore_cols and df[c].dtype != "object"]].fillna(0)
@@ -80,8 +94,32 @@ if page == "Forecast Dashboard":
     preds = model.predict(X)
     latest_pred = preds[-1]
 
+    # Serve the forecast issued by the pipeline; predict live if none is stored or it is stale
+    stored, stale_note = None, "no stored forecast"
+    try:
+        latest = get_forecast_store().latest_forecast("Karachi")
+        latest = latest[latest["horizon"] == day_choice]
+        if not latest.empty:
+            age = pd.Timestamp.now(tz="UTC").tz_localize(None) - latest.iloc[0]["issue_time"]
+            if age <= pd.Timedelta(hours=FORECAST_MAX_AGE_HOURS):
+                stored = latest.iloc[0]
+            else:
+                stale_note = f"stored forecast is {age.total_seconds() / 3600:.0f}h old"
+    except Exception as e:
+        st.warning(f"Could not read forecast store: {e}")
+
     st.title("🌫️ Karachi Air Quality Forecast")
-    st.metric(label=f"Predicted AQI for {forecast_date}", value=f"{latest_pred:.1f}")
+    if stored is not None:
+        # Day-N models predict the mean AQI of the 24 hours ending at target_time
+        window_start = stored["target_time"] - pd.Timedelta(hours=24)
+        st.metric(
+            label=f"Predicted AQI for {window_start:%a %d %b %H:%M} – {stored['target_time']:%a %d %b %H:%M} UTC",
+            value=f"{stored['aqi_pred']:.1f}",
+        )
+        st.caption(f"Issued {stored['issue_time']:%d %b %Y %H:%M} UTC by model {stored['model_version']}")
+    else:
+        st.metric(label=f"Predicted AQI for {forecast_date}", value=f"{latest_pred:.1f}")
+        st.caption(f"Live prediction ({stale_note}) by model {model_version}")
 
     st.line_chart(pd.DataFrame({
         "timestamp": df["timestamp"],
@@ -194,4 +232,17 @@ else:
     except Exception as e:
         st.warning(f"Could not load model metrics: {e}")
 
-
+    # ------------------- LIVE ACCURACY SECTION -------------------
+    st.subheader("🎯 Live Forecast Accuracy (Recorded Forecasts)")
+    try:
+        report = get_forecast_store().backtest_report(city="Karachi")
+        if report.empty:
+            st.info("No recorded forecasts have a fully observed target day yet.")
+        else:
+            report["horizon"] = report["horizon"].map(lambda d: f"Day {d}")
+            st.dataframe(report.rename(columns={
+                "horizon": "Model", "model_version": "Version", "n": "Forecasts",
+                "mae": "MAE", "rmse": "RMSE", "bias": "Bias"
+            }).drop(columns=["city"]).set_index("Model"), use_container_width=True)
+    except Exception as e:
+        st.warning(f"Could not load forecast accuracy: {e}")